@@ -2,6 +2,7 @@ import os
 import logging
 import asyncio
 import pickle
+import time
 from datetime import datetime
 from collections import deque
 from telegram import (
@@ -37,15 +38,25 @@ try:
 except ImportError:
     inappropriate_words = []
 
+from spam_filter import SpamDetector
+import event_log
+from bounded_state import BoundedState
+
 # Load environment variables
 load_dotenv()
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 ADMIN_USER_ID = int(os.getenv("ADMIN_USER_ID"))
 INACTIVITY_TIMEOUT = 604800  # 7 days in seconds
 DONATION_LINK = os.getenv("DONATION_LINK", "https://example.com/donate")
+SPAM_PARTNER_THRESHOLD = 8  # distinct partners receiving the same text
+SPAM_WINDOW = 600  # 10 minutes in seconds
+SPAM_HIT_HALF_LIFE = 86400  # 1 day in seconds
+WARNING_HALF_LIFE = 259200  # 3 days in seconds
+MAX_TRACKED_USERS = 100000  # cap for in-memory per-user state
 
 # Data persistence file
 DATA_FILE = "data/bot_data.pkl"
+EVENTS_DIR = "data/events"
 
 def load_data():
     try:
@@ -77,12 +88,15 @@ blocked_users, user_settings, all_users, user_reports = load_data()
 waiting_users = deque()
 active_chats = {}
 chat_start_times = {}  # NEW: store connection time for each user in a chat
-warning_counts = {}
-user_inactivity = {}
+warning_counts = BoundedState(MAX_TRACKED_USERS, half_life=WARNING_HALF_LIFE)
+user_inactivity = BoundedState(MAX_TRACKED_USERS)
+spam_hits = BoundedState(MAX_TRACKED_USERS, half_life=SPAM_HIT_HALF_LIFE)
+spam_detector = SpamDetector(partner_threshold=SPAM_PARTNER_THRESHOLD, window=SPAM_WINDOW)
+events = event_log.EventRecorder(EVENTS_DIR)
 
 # Utility function to update user activity
 def update_activity(user_id):
-    user_inactivity[user_id] = datetime.now()
+    user_inactivity.set(user_id, time.time())
 
 # ========================
 # Command Handlers
@@ -183,6 +197,7 @@ async def find(update: Update, context: CallbackContext):
         now = datetime.now()
         chat_start_times[user_id] = now
         chat_start_times[partner_id] = now
+        events.record(event_log.MATCH, user_id, partner_id)
 
         msg = (
             "Partner found 😺\n\n"
@@ -195,6 +210,7 @@ async def find(update: Update, context: CallbackContext):
     else:
         if user_id not in waiting_users:
             waiting_users.append(user_id)
+            events.record(event_log.QUEUE, user_id)
             await update.message.reply_text("⏳ Looking for a partner...")
         else:
             await update.message.reply_text("You're already in the waiting queue.")
@@ -239,6 +255,7 @@ async def next_command(update: Update, context: CallbackContext):
         return
     
     if user_id in active_chats:
+        events.record(event_log.NEXT, user_id, active_chats[user_id])
         await stop(update, context)
     
     await find(update, context)
@@ -251,6 +268,7 @@ async def stop(update: Update, context: CallbackContext):
     
     if user_id in active_chats:
         partner_id = active_chats.get(user_id)
+        events.record(event_log.STOP, user_id, partner_id)
         if partner_id in active_chats:
             del active_chats[partner_id]
             if partner_id in chat_start_times:
@@ -280,6 +298,7 @@ async def stop(update: Update, context: CallbackContext):
         )
     elif user_id in waiting_users:
         waiting_users.remove(user_id)
+        events.record(event_log.STOP, user_id)
         await update.message.reply_text(
             "_✅ You have left the queue.\nType /find to find a new partner_\n\n`https://t.me/KuuChatBot`",
             parse_mode=ParseMode.MARKDOWN, disable_web_page_preview=True
@@ -304,6 +323,7 @@ async def report_command(update: Update, context: CallbackContext):
     partner_id = active_chats[user_id]
     user_reports[partner_id] = reason
     save_data()
+    events.record(event_log.REPORT, user_id, partner_id)
     
     await update.message.reply_text("✅ Your report has been submitted. Thank you for keeping our community safe!")
     await context.bot.send_message(
@@ -411,6 +431,7 @@ async def handle_admin_input(update: Update, context: CallbackContext):
             target_id = int(target)
             blocked_users.add(target_id)
             save_data()
+            events.record(event_log.BLOCK, target_id, value=1)
             await update.message.reply_text(f"User {target_id} has been blocked.")
         except ValueError:
             await update.message.reply_text("Invalid user ID.")
@@ -524,6 +545,31 @@ async def list_users_command(update: Update, context: CallbackContext):
 # Message Handlers
 # ========================
 
+async def warn_user(update: Update, context: CallbackContext, user_id, warning_text):
+    # Warnings decay over time; round so three quick warnings still count as three.
+    if round(warning_counts.add(user_id)) >= 3:
+        blocked_users.add(user_id)
+        save_data()
+        events.record(event_log.BLOCK, user_id)
+        await cleanup_chat(user_id, context.bot)
+        await update.message.reply_text("🚫 You have been blocked for inappropriate behavior.")
+    else:
+        await update.message.reply_text(warning_text)
+
+async def report_spam(update: Update, context: CallbackContext, user_id, text):
+    # Repeated text is also what an ordinary user's intro looks like, so spam
+    # hits never feed the automatic block; the admin decides instead.
+    if round(spam_hits.add(user_id)) == 1:
+        try:
+            await context.bot.send_message(
+                ADMIN_USER_ID,
+                f"🚩 Possible spam from {user_id}: the same text reached "
+                f"{SPAM_PARTNER_THRESHOLD}+ partners.\n\n{text[:200]}"
+            )
+        except Exception:
+            logger.warning("Could not alert admin about spam from %s", user_id)
+    await update.message.reply_text("⚠️ Please don't send the same message to every partner.")
+
 async def handle_message(update: Update, context: CallbackContext):
     if not update.message:
         return
@@ -550,20 +596,17 @@ async def handle_message(update: Update, context: CallbackContext):
     text = update.message.text.lower() if update.message.text else ""
     caption = update.message.caption.lower() if update.message.caption else ""
     if any(word in text or word in caption for word in inappropriate_words):
-        warning_counts[user_id] = warning_counts.get(user_id, 0) + 1
-        if warning_counts[user_id] >= 3:
-            blocked_users.add(user_id)
-            save_data()
-            await cleanup_chat(user_id, context.bot)
-            await update.message.reply_text("🚫 You have been blocked for inappropriate behavior.")
-            return
-        else:
-            await update.message.reply_text("⚠️ Please avoid inappropriate content.")
-            return  # Stop processing this message further
+        await warn_user(update, context, user_id, "⚠️ Please avoid inappropriate content.")
+        return  # Stop processing this message further
 
     # Forward the message to the active chat partner using copy_message
     if user_id in active_chats:
         partner_id = active_chats[user_id]
+        # Catch the same promo text being pasted to partner after partner.
+        relayed_text = f"{text} {caption}".strip()
+        if spam_detector.check(user_id, partner_id, relayed_text):
+            await report_spam(update, context, user_id, relayed_text)
+            return
         try:
             await context.bot.copy_message(
                 chat_id=partner_id,
@@ -581,9 +624,9 @@ async def handle_message(update: Update, context: CallbackContext):
 # ========================
 
 async def handle_inactive_users(context: CallbackContext):
-    now = datetime.now()
-    for user_id, last_active in list(user_inactivity.items()):
-        if (now - last_active).total_seconds() > INACTIVITY_TIMEOUT:
+    now = time.time()
+    for user_id, last_active in user_inactivity.items():
+        if now - last_active > INACTIVITY_TIMEOUT:
             await cleanup_chat(user_id, context.bot)
             await context.bot.send_message(user_id, "⏲️ Session expired due to inactivity")
             del user_inactivity[user_id]
@@ -594,6 +637,7 @@ async def handle_inactive_users(context: CallbackContext):
 async def cleanup_chat(user_id, bot):
     if user_id in active_chats:
         partner_id = active_chats[user_id]
+        events.record(event_log.STOP, user_id, partner_id)
         if partner_id in active_chats:
             del active_chats[partner_id]
             if partner_id in chat_start_times:
@@ -602,6 +646,7 @@ async def cleanup_chat(user_id, bot):
         del active_chats[user_id]
     if user_id in waiting_users:
         waiting_users.remove(user_id)
+        events.record(event_log.STOP, user_id)
     if user_id in chat_start_times:
         del chat_start_times[user_id]
 
@@ -618,6 +663,7 @@ async def handle_feedback(update: Update, context: CallbackContext):
     if not query:
         return
     await query.answer()
+    events.record(event_log.FEEDBACK, query.from_user.id, value=1 if query.data == "like" else -1)
     if query.data == "like":
         await query.edit_message_text("👍 Thank you for your feedback!")
     elif query.data == "dislike":
@@ -697,6 +743,7 @@ def main():
         application.run_polling()
     finally:
         save_data()
+        events.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,104 @@
+# bench_bounded_state.py
+#
+# Simulates weeks of bot uptime against the per-user state in app.py and
+# reports memory traced by tracemalloc (not process RSS) per simulated day:
+#     python bench_bounded_state.py [days] [messages_per_day] [bounded|plain]
+#
+# Exits 1 unless memory stays flat once the store is full. Running it with
+# `plain` (the unbounded dicts app.py used before) is expected to fail.
+
+import sys
+import random
+import tracemalloc
+
+from bounded_state import BoundedState
+
+DAY = 86400
+NEW_USERS_PER_DAY = 20000
+CAPACITY = 100000
+WARNING_HALF_LIFE = 259200
+# Allowed traced-memory growth between the end of warm-up and the last day.
+FLAT_TOLERANCE = 0.02
+
+
+def simulate(make_store, days, messages_per_day):
+    random.seed(1)
+    inactivity = make_store(None)
+    warnings = make_store(WARNING_HALF_LIFE)
+    next_user = 0
+    samples = []
+
+    tracemalloc.start()
+    for day in range(days):
+        next_user += NEW_USERS_PER_DAY
+        for i in range(messages_per_day):
+            now = day * DAY + i * DAY / messages_per_day
+            # Most traffic comes from recent users, with a long tail of returning ones.
+            user_id = next_user - int(random.expovariate(1 / NEW_USERS_PER_DAY)) % next_user
+            inactivity.set(user_id, now)
+            if random.random() < 0.01:
+                warnings.add(user_id, 1.0, now)
+        current, _ = tracemalloc.get_traced_memory()
+        samples.append((current, len(inactivity), index_bytes(inactivity)))
+    tracemalloc.stop()
+    return samples
+
+
+def index_bytes(store):
+    return sys.getsizeof(store._index if isinstance(store, BoundedState) else store)
+
+
+def warmed_up_day(samples):
+    """Return the first day after the store filled up and its index dict resized once, or None.
+
+    Once full, delete/insert churn makes the index dict double once and then
+    stay that size; memory is only expected to be flat after that.
+    """
+    filled_bytes = None
+    for day, (_, entries, size) in enumerate(samples):
+        if filled_bytes is None:
+            if entries >= CAPACITY:
+                filled_bytes = size
+        elif size > filled_bytes:
+            return day
+    return None
+
+
+class PlainStore(dict):
+    """The unbounded dicts app.py used before BoundedState."""
+
+    def set(self, key, value, now=None):
+        self[key] = value
+
+    def add(self, key, amount=1.0, now=None):
+        self[key] = self.get(key, 0.0) + amount
+        return self[key]
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 28
+    messages_per_day = int(sys.argv[2]) if len(sys.argv) > 2 else 30000
+    kind = sys.argv[3] if len(sys.argv) > 3 else "bounded"
+    if kind == "plain":
+        make_store = lambda half_life: PlainStore()
+    else:
+        make_store = lambda half_life: BoundedState(CAPACITY, half_life=half_life)
+
+    samples = simulate(make_store, days, messages_per_day)
+    print(f"{'day':>4} {'traced KiB':>11} {'entries':>8}")
+    for day, (current, entries, _) in enumerate(samples, 1):
+        print(f"{day:>4} {current // 1024:>11} {entries:>8}")
+
+    warm = warmed_up_day(samples)
+    if warm is None or warm >= len(samples) - 2:
+        print(f"\n{kind}: store did not fill and settle within {days} days; run longer")
+        sys.exit(1)
+    settled = samples[warm][0]
+    growth = (samples[-1][0] - settled) / settled
+    print(f"\n{kind}: traced memory grew {growth:.1%} from day {warm + 1} to day {days}")
+    if growth > FLAT_TOLERANCE:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
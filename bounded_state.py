@@ -0,0 +1,168 @@
+# bounded_state.py
+
+import time
+import random
+from array import array
+
+
+class BoundedState:
+    """Fixed-capacity per-user store of float values, e.g. warning counters or timestamps.
+
+    Keys are integer user IDs. Values and their last-update times live in
+    parallel arrays indexed by a slot number, so total size is set by
+    `max_entries` rather than by how many users have ever been seen.
+
+    - `ttl`: entries not updated for this many seconds are treated as missing.
+    - `half_life`: values decay exponentially, halving every `half_life`
+      seconds since their last update; entries that decay below `min_value`
+      are dropped.
+    - `max_entries`: hard cap. Inserting into a full store evicts the least
+      recently updated of `sample_size` randomly chosen entries (approximate
+      LRU), so eviction is O(sample_size) rather than a full scan.
+    """
+
+    __slots__ = (
+        "max_entries", "ttl", "half_life", "min_value", "sample_size",
+        "_index", "_keys", "_values", "_stamps", "_free",
+    )
+
+    def __init__(self, max_entries, ttl=None, half_life=None, min_value=0.05, sample_size=8):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.half_life = half_life
+        self.min_value = min_value
+        self.sample_size = sample_size
+
+        self._index = {}  # key -> slot
+        self._keys = array("q")
+        self._values = array("d")
+        self._stamps = array("d")
+        self._free = []  # slots released by deletes, reused before growing
+
+    def __len__(self):
+        """Count live entries; purges expired ones first, so this is O(n)."""
+        self.purge()
+        return len(self._index)
+
+    def __contains__(self, key):
+        return self._live_slot(key, time.time()) is not None
+
+    def __delitem__(self, key):
+        slot = self._index.pop(key)
+        self._free.append(slot)
+
+    def _current(self, slot, now):
+        """Return the slot's value as of `now`, or None if it has expired."""
+        elapsed = now - self._stamps[slot]
+        if self.ttl is not None and elapsed > self.ttl:
+            return None
+        value = self._values[slot]
+        if self.half_life is not None and elapsed > 0:
+            value *= 0.5 ** (elapsed / self.half_life)
+            if abs(value) < self.min_value:
+                return None
+        return value
+
+    def _live_slot(self, key, now):
+        slot = self._index.get(key)
+        if slot is None:
+            return None
+        if self._current(slot, now) is None:
+            del self[key]
+            return None
+        return slot
+
+    def _evict_one(self, now):
+        size = len(self._keys)
+        victim = None
+        oldest = None
+        for _ in range(self.sample_size):
+            slot = random.randrange(size)
+            if self._current(slot, now) is None:
+                victim = slot
+                break
+            if oldest is None or self._stamps[slot] < oldest:
+                victim, oldest = slot, self._stamps[slot]
+        del self._index[self._keys[victim]]
+        return victim
+
+    def _reclaim_expired(self, now):
+        """Probe a few random slots and free the first expired one, so idle entries don't pile up."""
+        size = len(self._keys)
+        if not size or (self.ttl is None and self.half_life is None):
+            return None
+        for _ in range(self.sample_size):
+            slot = random.randrange(size)
+            key = self._keys[slot]
+            if self._index.get(key) == slot and self._current(slot, now) is None:
+                del self._index[key]
+                return slot
+        return None
+
+    def _allocate(self, key, now):
+        slot = self._free.pop() if self._free else self._reclaim_expired(now)
+        if slot is None:
+            if len(self._keys) < self.max_entries:
+                slot = len(self._keys)
+                self._keys.append(0)
+                self._values.append(0.0)
+                self._stamps.append(0.0)
+            else:
+                slot = self._evict_one(now)
+        self._index[key] = slot
+        self._keys[slot] = key
+        return slot
+
+    def get(self, key, default=0.0, now=None):
+        if now is None:
+            now = time.time()
+        slot = self._live_slot(key, now)
+        if slot is None:
+            return default
+        return self._current(slot, now)
+
+    def set(self, key, value, now=None):
+        if now is None:
+            now = time.time()
+        slot = self._index.get(key)
+        if slot is None:
+            slot = self._allocate(key, now)
+        self._values[slot] = value
+        self._stamps[slot] = now
+
+    def add(self, key, amount=1.0, now=None):
+        """Add `amount` to the (decayed) value for key and return the new value."""
+        if now is None:
+            now = time.time()
+        value = self.get(key, 0.0, now) + amount
+        self.set(key, value, now)
+        return value
+
+    def pop(self, key, default=None, now=None):
+        if now is None:
+            now = time.time()
+        slot = self._live_slot(key, now)
+        if slot is None:
+            return default
+        value = self._current(slot, now)
+        del self[key]
+        return value
+
+    def items(self, now=None):
+        """Return a list of live (key, value) pairs, dropping expired entries as a side effect."""
+        if now is None:
+            now = time.time()
+        live = []
+        for key, slot in list(self._index.items()):
+            value = self._current(slot, now)
+            if value is None:
+                del self[key]
+            else:
+                live.append((key, value))
+        return live
+
+    def purge(self, now=None):
+        """Drop all expired or fully decayed entries."""
+        self.items(now)
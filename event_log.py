@@ -0,0 +1,166 @@
+# event_log.py
+
+import os
+import re
+import mmap
+import time
+import struct
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+# Event types
+QUEUE = 1     # user entered the waiting queue
+MATCH = 2     # user was paired with partner
+STOP = 3      # chat between user and partner ended
+NEXT = 4      # user skipped partner with /next
+FEEDBACK = 5  # value is 1 for like, -1 for dislike
+REPORT = 6    # user reported partner
+BLOCK = 7     # value is 1 when blocked by the admin, 0 when blocked automatically
+
+EVENT_NAMES = {
+    QUEUE: "queue",
+    MATCH: "match",
+    STOP: "stop",
+    NEXT: "next",
+    FEEDBACK: "feedback",
+    REPORT: "report",
+    BLOCK: "block",
+}
+
+# timestamp, user_id, partner_id, event type, 3 pad bytes, value -> 32 bytes per record
+RECORD = struct.Struct("<dqqBxxxi")
+RECORD_SIZE = RECORD.size
+
+logger = logging.getLogger(__name__)
+
+_SEGMENT_RE = re.compile(r"^events-(\d{6})\.bin$")
+
+
+def _segment_paths(directory):
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    segments = sorted(name for name in names if _SEGMENT_RE.match(name))
+    return [os.path.join(directory, name) for name in segments]
+
+
+class EventRecorder:
+    """Buffers fixed-width event records and writes them to rotating segment files.
+
+    `record` only packs into an in-memory buffer. Once the buffer holds
+    `flush_records` records, or `flush_interval` seconds after the first
+    buffered record (a timer on the running event loop), the batch is handed
+    to a single background thread which appends it to the current segment,
+    starting a new one once that segment reaches `max_segment_bytes`.
+    """
+
+    def __init__(self, directory, max_segment_bytes=8 * 1024 * 1024,
+                 flush_records=256, flush_interval=30):
+        if max_segment_bytes < RECORD_SIZE:
+            raise ValueError(f"max_segment_bytes must be at least one record ({RECORD_SIZE} bytes)")
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes - max_segment_bytes % RECORD_SIZE
+        self.flush_bytes = flush_records * RECORD_SIZE
+        self.flush_interval = flush_interval
+
+        self._buffer = bytearray()
+        self._buffer_started = None
+        self._flush_timer = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="event-log")
+        self._segment = None
+        self._segment_size = 0
+        # Never append to an old segment; it may end in a partial record after a crash.
+        existing = _segment_paths(directory)
+        self._next_index = 1
+        if existing:
+            self._next_index = int(_SEGMENT_RE.match(os.path.basename(existing[-1])).group(1)) + 1
+
+    def record(self, event_type, user_id, partner_id=0, value=0):
+        now = time.time()
+        self._buffer += RECORD.pack(now, user_id, partner_id or 0, event_type, value)
+        if self._buffer_started is None:
+            self._buffer_started = now
+            self._start_flush_timer()
+        if len(self._buffer) >= self.flush_bytes or now - self._buffer_started >= self.flush_interval:
+            self.flush()
+
+    def _start_flush_timer(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._flush_timer = loop.call_later(self.flush_interval, self.flush)
+
+    def _cancel_flush_timer(self):
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+    def flush(self):
+        self._cancel_flush_timer()
+        if not self._buffer:
+            return
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        self._buffer_started = None
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (e.g. during shutdown): write in the calling thread.
+            self._executor.submit(self._write, data).result()
+            return
+        future = loop.run_in_executor(self._executor, self._write, data)
+        future.add_done_callback(_log_write_error)
+
+    def close(self):
+        self._cancel_flush_timer()
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        self._buffer_started = None
+        if data:
+            self._executor.submit(self._write, data)
+        self._executor.shutdown(wait=True)
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+    def _open_segment(self):
+        if self._segment is not None:
+            self._segment.close()
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"events-{self._next_index:06d}.bin")
+        self._next_index += 1
+        self._segment = open(path, "ab")
+        self._segment_size = 0
+
+    def _write(self, data):
+        view = memoryview(data)
+        while view:
+            if self._segment is None or self._segment_size >= self.max_segment_bytes:
+                self._open_segment()
+            chunk = view[:self.max_segment_bytes - self._segment_size]
+            self._segment.write(chunk)
+            self._segment_size += len(chunk)
+            view = view[len(chunk):]
+        self._segment.flush()
+
+
+def _log_write_error(future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Failed to write event log batch", exc_info=future.exception())
+
+
+def iter_events(directory):
+    """Yield (timestamp, event_type, user_id, partner_id, value) for every recorded event, oldest first."""
+    for path in _segment_paths(directory):
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            usable = size - size % RECORD_SIZE  # ignore a partial record left by a crash
+            if not usable:
+                continue
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for offset in range(0, usable, RECORD_SIZE):
+                    timestamp, user_id, partner_id, event_type, value = RECORD.unpack_from(mm, offset)
+                    yield timestamp, event_type, user_id, partner_id, value
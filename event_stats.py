@@ -0,0 +1,116 @@
+# event_stats.py
+#
+# Offline report over the chat event log written by app.py:
+#     python event_stats.py [data/events]
+
+import sys
+import math
+from collections import Counter
+
+from event_log import iter_events, EVENT_NAMES, QUEUE, MATCH, STOP, FEEDBACK
+
+
+class Histogram:
+    """Streaming histogram with log-spaced buckets; memory does not grow with the sample count."""
+
+    BUCKETS_PER_DOUBLING = 4
+
+    def __init__(self):
+        self.buckets = Counter()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        seconds = max(seconds, 0.0)
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.buckets[self._bucket(seconds)] += 1
+
+    def _bucket(self, seconds):
+        if seconds < 1:
+            return 0
+        return int(math.log2(seconds) * self.BUCKETS_PER_DOUBLING) + 1
+
+    def _upper_bound(self, bucket):
+        if bucket == 0:
+            return 1.0
+        return 2 ** (bucket / self.BUCKETS_PER_DOUBLING)
+
+    def percentile(self, p):
+        if not self.count:
+            return 0.0
+        target = p / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return min(self._upper_bound(bucket), self.max)
+        return self.max
+
+    def summary(self):
+        if not self.count:
+            return "no samples"
+        return (
+            f"n={self.count} mean={format_seconds(self.total / self.count)} "
+            f"p50={format_seconds(self.percentile(50))} "
+            f"p90={format_seconds(self.percentile(90))} "
+            f"p99={format_seconds(self.percentile(99))} "
+            f"max={format_seconds(self.max)}"
+        )
+
+
+def format_seconds(seconds):
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.1f}m"
+    return f"{seconds / 3600:.1f}h"
+
+
+def analyze(directory):
+    counts = Counter()
+    feedback = Counter()
+    chat_durations = Histogram()
+    match_waits = Histogram()
+    # Only users currently waiting or chatting are kept in memory.
+    queued_at = {}
+    chat_started = {}
+
+    for timestamp, event_type, user_id, partner_id, value in iter_events(directory):
+        counts[event_type] += 1
+        if event_type == QUEUE:
+            queued_at[user_id] = timestamp
+        elif event_type == MATCH:
+            for uid in (user_id, partner_id):
+                # The user who runs /find while someone is waiting is matched
+                # without ever being queued, so their wait is zero.
+                match_waits.add(timestamp - queued_at.pop(uid, timestamp))
+                chat_started[uid] = timestamp
+        elif event_type == STOP:
+            started = chat_started.pop(user_id, None)
+            chat_started.pop(partner_id, None)
+            queued_at.pop(user_id, None)
+            if started is not None:
+                chat_durations.add(timestamp - started)
+        elif event_type == FEEDBACK:
+            feedback["like" if value > 0 else "dislike"] += 1
+
+    return counts, feedback, chat_durations, match_waits
+
+
+def main():
+    directory = sys.argv[1] if len(sys.argv) > 1 else "data/events"
+    counts, feedback, chat_durations, match_waits = analyze(directory)
+
+    print("📊 Event counts")
+    for event_type, name in EVENT_NAMES.items():
+        print(f"  {name}: {counts[event_type]}")
+    print(f"  likes: {feedback['like']}, dislikes: {feedback['dislike']}")
+    print(f"\n💬 Chat duration: {chat_durations.summary()}")
+    print(f"⏳ Time to match: {match_waits.summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# spam_filter.py
+
+import re
+import time
+import random
+import hashlib
+from array import array
+from operator import eq
+
+NUM_HASHES = 64
+SHINGLE_SIZE = 5
+# Only the start of a message is fingerprinted, keeping each call to a few
+# hundred shingles however long the message is.
+MAX_FINGERPRINT_CHARS = 512
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Each signature position XORs the 64-bit shingle hashes with its own fixed
+# mask before taking the minimum; that is much cheaper than (a * h + b) mod p
+# and works as well on already well-mixed blake2b hashes.
+_rng = random.Random(0x6b7575)
+_MASKS = [_rng.getrandbits(64) for _ in range(NUM_HASHES)]
+del _rng
+
+
+def shingles(text):
+    """Return the 5-character shingles of the start of text, with punctuation and case removed."""
+    normalized = " ".join(_TOKEN_RE.findall(text[:MAX_FINGERPRINT_CHARS].lower()))
+    if not normalized:
+        return set()
+    return {
+        normalized[i:i + SHINGLE_SIZE]
+        for i in range(max(1, len(normalized) - SHINGLE_SIZE + 1))
+    }
+
+
+def minhash(text):
+    """Return a MinHash signature of text's shingles, or None if it has no words.
+
+    Editing, adding or dropping one word only touches a few shingles, so the
+    signatures of near-duplicate texts agree in most positions.
+    """
+    features = shingles(text)
+    if not features:
+        return None
+    hashes = [
+        int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+        for feature in features
+    ]
+    return array("Q", [min([h ^ mask for h in hashes]) for mask in _MASKS])
+
+
+def similarity(a, b):
+    """Estimate the Jaccard similarity of two texts from their MinHash signatures."""
+    return sum(map(eq, a, b)) / NUM_HASHES
+
+
+class SpamDetector:
+    """Flags senders who relay near-identical text to many distinct partners.
+
+    Signatures live in a fixed-size ring buffer, so memory never grows past
+    `capacity` entries. Each sender's entries are indexed under their sender
+    ID, newest last and capped at `bucket_size`, so a lookup compares against
+    at most `bucket_size` signatures however large the history is. Two
+    messages match when their estimated similarity is at least
+    `min_similarity`.
+    Entries older than `window` seconds are ignored and eventually overwritten.
+
+    Messages shorter than `min_tokens` words or `min_chars` characters are
+    never flagged: short openers like "hi m or f" are sent to every partner
+    by ordinary users. Longer intros get pasted too, which is why
+    `partner_threshold` sits well above a few /next hops.
+    """
+
+    def __init__(self, partner_threshold=8, window=600, min_similarity=0.5,
+                 capacity=20000, bucket_size=16, min_tokens=8, min_chars=40):
+        self.partner_threshold = partner_threshold
+        self.window = window
+        self.min_similarity = min_similarity
+        self.capacity = capacity
+        self.bucket_size = bucket_size
+        self.min_tokens = min_tokens
+        self.min_chars = min_chars
+
+        # Ring buffer slots hold (timestamp, sender_id, partner_id, signature) or None.
+        self._slots = [None] * capacity
+        self._cursor = 0
+        # sender_id -> list of slot indices, oldest first.
+        self._buckets = {}
+
+    def _evict(self, slot):
+        entry = self._slots[slot]
+        if entry is None:
+            return
+        sender_id = entry[1]
+        bucket = self._buckets.get(sender_id)
+        if bucket is not None:
+            try:
+                bucket.remove(slot)
+            except ValueError:
+                pass
+            if not bucket:
+                del self._buckets[sender_id]
+        self._slots[slot] = None
+
+    def _insert(self, entry):
+        slot = self._cursor
+        self._evict(slot)
+        self._slots[slot] = entry
+        bucket = self._buckets.setdefault(entry[1], [])
+        if len(bucket) >= self.bucket_size:
+            # Drop the oldest reference; the slot itself is reclaimed by the ring.
+            bucket.pop(0)
+        bucket.append(slot)
+        self._cursor = (slot + 1) % self.capacity
+
+    def check(self, sender_id, partner_id, text, now=None):
+        """Record a relayed message and return True if the sender looks like a spammer."""
+        text = text[:MAX_FINGERPRINT_CHARS] if text else text
+        if not text or len(text) < self.min_chars or len(_TOKEN_RE.findall(text)) < self.min_tokens:
+            return False
+        signature = minhash(text)
+        if signature is None:
+            return False
+        if now is None:
+            now = time.monotonic()
+
+        partners = {partner_id}
+        for slot in self._buckets.get(sender_id, ()):
+            timestamp, _, other_partner, other_signature = self._slots[slot]
+            if now - timestamp > self.window:
+                continue
+            if similarity(signature, other_signature) >= self.min_similarity:
+                partners.add(other_partner)
+
+        self._insert((now, sender_id, partner_id, signature))
+        return len(partners) >= self.partner_threshold
@@ -0,0 +1,36 @@
+import time
+
+from bounded_state import BoundedState
+
+
+def test_entry_cap_evicts_least_recently_updated():
+    store = BoundedState(100, sample_size=100)
+    for user_id in range(150):
+        store.set(user_id, float(user_id), now=user_id)
+    assert len(store) == 100
+    assert store.get(149, now=150) == 149.0
+    assert store.get(0, default=None, now=150) is None
+
+
+def test_warnings_decay_with_half_life():
+    warnings = BoundedState(10, half_life=100)
+    assert [round(warnings.add(1, now=t)) for t in (0, 1, 2)] == [1, 2, 3]
+    assert abs(warnings.get(1, now=102) - 1.5) < 0.05
+    assert warnings.get(1, now=10000) == 0.0
+
+
+def test_ttl_expires_entries():
+    store = BoundedState(10, ttl=60)
+    store.set(1, 5.0, now=0)
+    assert store.get(1, now=30) == 5.0
+    assert store.get(1, default=None, now=61) is None
+    assert len(store) == 0
+
+
+def test_len_agrees_with_contains_for_expired_entries():
+    store = BoundedState(10, ttl=0.05)
+    store.set(1, 5.0)
+    store.set(2, 6.0)
+    time.sleep(0.1)
+    assert 1 not in store
+    assert len(store) == 0
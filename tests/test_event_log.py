@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+import event_log
+from event_log import EventRecorder, iter_events, RECORD_SIZE
+from event_stats import analyze
+
+
+def test_events_round_trip_across_rotated_segments(tmp_path):
+    recorder = EventRecorder(tmp_path, max_segment_bytes=RECORD_SIZE * 3, flush_records=2)
+    for user_id in range(10):
+        recorder.record(event_log.QUEUE, user_id)
+    recorder.close()
+
+    assert len(os.listdir(tmp_path)) == 4
+    assert [event[2] for event in iter_events(tmp_path)] == list(range(10))
+
+
+def test_segment_smaller_than_a_record_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        EventRecorder(tmp_path, max_segment_bytes=RECORD_SIZE - 1)
+
+
+def test_instant_match_counts_as_zero_wait(tmp_path):
+    recorder = EventRecorder(tmp_path)
+    recorder.record(event_log.QUEUE, 1)
+    recorder.record(event_log.MATCH, 2, 1)
+    recorder.record(event_log.STOP, 2, 1)
+    recorder.close()
+
+    _, _, chat_durations, match_waits = analyze(tmp_path)
+    assert match_waits.count == 2
+    assert chat_durations.count == 1
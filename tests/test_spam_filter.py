@@ -0,0 +1,80 @@
+import time
+import random
+
+from spam_filter import SpamDetector, MAX_FINGERPRINT_CHARS, minhash, shingles, similarity
+
+PROMO = (
+    "Hey there join my telegram channel today for free crypto trading signals "
+    "daily giveaways and exclusive airdrops click the link in my bio now before "
+    "spots run out friend"
+)
+
+
+def test_one_word_edits_stay_near_duplicates():
+    detector = SpamDetector()
+    base = minhash(PROMO)
+    words = PROMO.split()
+    rng = random.Random(0)
+    for _ in range(200):
+        edited = list(words)
+        edited[rng.randrange(len(edited))] = f"word{rng.randrange(1000)}"
+        assert similarity(base, minhash(" ".join(edited))) >= detector.min_similarity
+
+
+def test_prefix_and_suffix_changes_stay_near_duplicates():
+    detector = SpamDetector()
+    base = minhash(PROMO)
+    for variant in ("hello! " + PROMO, PROMO + " bye 42", "hi hi " + PROMO + " :)"):
+        assert similarity(base, minhash(variant)) >= detector.min_similarity
+
+
+def test_varied_promo_to_many_partners_is_flagged():
+    detector = SpamDetector(partner_threshold=3)
+    variants = [PROMO, "hello! " + PROMO, PROMO.replace("today", "tonight"), PROMO + " 7"]
+    flags = [detector.check(1, 100 + i, text, now=i) for i, text in enumerate(variants)]
+    assert flags == [False, False, True, True]
+
+
+def test_unrelated_messages_are_not_flagged():
+    detector = SpamDetector(partner_threshold=2)
+    assert not detector.check(1, 100, PROMO, now=0)
+    assert not detector.check(1, 101, "I spent the whole afternoon fixing my bike and then it rained on the way home", now=1)
+
+
+def test_messages_outside_window_are_forgotten():
+    detector = SpamDetector(partner_threshold=3, window=60)
+    assert not detector.check(1, 100, PROMO, now=0)
+    assert not detector.check(1, 101, PROMO, now=100)
+    assert not detector.check(1, 102, PROMO, now=200)
+
+
+def test_short_greetings_are_never_flagged():
+    detector = SpamDetector()
+    for greeting in ("hi m or f", "hey how are you doing today", "hello asl? from india here"):
+        assert not any(detector.check(1, partner, greeting, now=partner) for partner in range(20))
+
+
+def test_memory_is_bounded_by_capacity():
+    detector = SpamDetector(capacity=8)
+    for i in range(100):
+        detector.check(i % 3, i, f"message number {i} with quite a few more words in it for the filter", now=i)
+    assert sum(len(bucket) for bucket in detector._buckets.values()) <= 8
+
+
+def test_long_intro_pasted_after_next_is_not_flagged():
+    detector = SpamDetector()
+    intro = "hi im 21 f from delhi, looking for someone to talk to"
+    assert not any(detector.check(1, partner, intro, now=partner * 60) for partner in range(6))
+
+
+def test_only_the_start_of_long_messages_is_fingerprinted():
+    rng = random.Random(0)
+    words = ["".join(rng.choice("abcdefghij") for _ in range(rng.randint(3, 8))) for _ in range(800)]
+    long_text = " ".join(words)[:4096]
+    assert len(shingles(long_text)) <= MAX_FINGERPRINT_CHARS
+    assert minhash(long_text) == minhash(long_text[:MAX_FINGERPRINT_CHARS])
+
+    start = time.perf_counter()
+    for _ in range(10):
+        SpamDetector().check(1, 2, long_text)
+    assert (time.perf_counter() - start) / 10 < 0.01